@@ -1,24 +1,37 @@
 import os
+import sys
 import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'library_management.settings')
 django.setup()
 
+from django.db import transaction
 from library.models import Book, Member
 from datetime import date
 
-# Create a book
-Book.objects.create(
-    title='Test Book 1',
-    author='Author 1',
-    isbn='1111111111',
-    genre='FIC',
-    published_date=date(2020, 1, 1),
-    publisher='Publisher 1',
-    description='Test description',
-    quantity=3,
-    available_copies=2
-)
+# Number of books to create; pass a count on the command line to seed more
+NUM_BOOKS = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+
+# Create books in batches; bulk_create skips Book.save(), so set
+# is_available here and let existing ISBNs be skipped on re-runs
+books = [
+    Book(
+        title=f'Test Book {i + 1}',
+        author=f'Author {i + 1}',
+        isbn=str(1111111111 + i),
+        genre='FIC',
+        published_date=date(2020, 1, 1),
+        publisher=f'Publisher {i + 1}',
+        description='Test description',
+        quantity=3,
+        available_copies=2,
+        is_available=True,
+    )
+    for i in range(NUM_BOOKS)
+]
+
+with transaction.atomic():
+    Book.objects.bulk_create(books, batch_size=1000, ignore_conflicts=True)
 
 print(f"Books in database: {Book.objects.count()}")
-print(f"Members in database: {Member.objects.count()}")
\ No newline at end of file
+print(f"Members in database: {Member.objects.count()}")
@@ -2,9 +2,38 @@
 Admin configuration for the library app.
 """
 
+from collections import Counter
+
 from django.contrib import admin
+from django.db import transaction
+from django.db.models import BooleanField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import Greatest, Least
+from django.utils import timezone
 from django.utils.html import format_html
+from django.utils.safestring import mark_safe
 from .models import Book, Member, Loan
+from .signals import invalidate_cached_pages
+
+
+_STATUS_MAP = dict(Loan.STATUS_CHOICES)
+_STATUS_COLOR_MAP = {
+    'ACT': 'blue',
+    'RET': 'green',
+    'OVE': 'red',
+    'CAN': 'gray',
+}
+_AVAIL_HTML = mark_safe('<span style="color: green;">✓ Available</span>')
+_UNAVAIL_HTML = mark_safe('<span style="color: red;">✗ Unavailable</span>')
+_CAN_BORROW_HTML = mark_safe('<span style="color: green;">Can borrow more books</span>')
+_LIMIT_REACHED_HTML = mark_safe('<span style="color: red;">Borrowing limit reached</span>')
+
+
+def _group_by_count(counts):
+    """Invert a Counter into {count: [keys with that count]}."""
+    groups = {}
+    for key, count in counts.items():
+        groups.setdefault(count, []).append(key)
+    return groups
 
 
 class BookAdmin(admin.ModelAdmin):
@@ -15,6 +44,8 @@ class BookAdmin(admin.ModelAdmin):
     list_filter = ['genre', 'created_at']
     search_fields = ['title', 'author', 'isbn']
     readonly_fields = ['created_at', 'updated_at']
+    list_per_page = 50
+    show_full_result_count = False
     fieldsets = (
         ('Basic Information', {
             'fields': ('title', 'author', 'isbn', 'genre')
@@ -33,21 +64,45 @@ class BookAdmin(admin.ModelAdmin):
     
     def is_available_display(self, obj):
         """Display availability status with color coding."""
-        if obj.is_available():
-            return format_html('<span style="color: green;">✓ Available</span>')
-        return format_html('<span style="color: red;">✗ Unavailable</span>')
+        if obj.is_available:
+            return _AVAIL_HTML
+        return _UNAVAIL_HTML
     is_available_display.short_description = 'Availability'
+    is_available_display.admin_order_field = 'is_available'
     
 
 
+class CanBorrowFilter(admin.SimpleListFilter):
+    """
+    Filter members by whether they can borrow more books.
+    """
+    title = 'borrowing status'
+    parameter_name = 'can_borrow'
+    
+    def lookups(self, request, model_admin):
+        return (
+            ('yes', 'Can borrow more books'),
+            ('no', 'Borrowing limit reached'),
+        )
+    
+    def queryset(self, request, queryset):
+        if self.value() == 'yes':
+            return queryset.filter(can_borrow=True)
+        if self.value() == 'no':
+            return queryset.filter(can_borrow=False)
+        return queryset
+
+
 class MemberAdmin(admin.ModelAdmin):
     """
     Custom admin interface for Member model.
     """
-    list_display = ['full_name', 'email', 'membership_type', 'is_active', 'books_borrowed']
-    list_filter = ['membership_type', 'is_active', 'membership_start_date']
+    list_display = ['full_name', 'email', 'membership_type', 'is_active', 'books_borrowed', 'books_borrowed_display']
+    list_filter = ['membership_type', 'is_active', CanBorrowFilter, 'membership_start_date']
     search_fields = ['first_name', 'last_name', 'email']
     readonly_fields = ['membership_start_date', 'books_borrowed_display']
+    list_per_page = 50
+    show_full_result_count = False
     fieldsets = (
         ('Personal Information', {
             'fields': ('first_name', 'last_name', 'email', 'phone', 'address')
@@ -60,6 +115,15 @@ class MemberAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        """Annotate whether each member can borrow more books."""
+        return super().get_queryset(request).annotate(
+            can_borrow=ExpressionWrapper(
+                Q(is_active=True) & Q(current_books_borrowed__lt=F('max_books_allowed')),
+                output_field=BooleanField(),
+            )
+        )
+    
     def books_borrowed(self, obj):
         """Display books borrowed count."""
         return f"{obj.current_books_borrowed}/{obj.max_books_allowed}"
@@ -67,10 +131,15 @@ class MemberAdmin(admin.ModelAdmin):
     
     def books_borrowed_display(self, obj):
         """Display borrowing status."""
-        if obj.can_borrow_more():
-            return format_html('<span style="color: green;">Can borrow more books</span>')
-        return format_html('<span style="color: red;">Borrowing limit reached</span>')
+        # Unsaved instances on the add form don't carry the annotation.
+        can_borrow = getattr(obj, 'can_borrow', None)
+        if can_borrow is None:
+            can_borrow = obj.can_borrow_more()
+        if can_borrow:
+            return _CAN_BORROW_HTML
+        return _LIMIT_REACHED_HTML
     books_borrowed_display.short_description = 'Borrowing Status'
+    books_borrowed_display.admin_order_field = 'can_borrow'
 
 
 class LoanAdmin(admin.ModelAdmin):
@@ -82,6 +151,13 @@ class LoanAdmin(admin.ModelAdmin):
     search_fields = ['book__title', 'member__first_name', 'member__last_name']
     readonly_fields = ['loan_date', 'status', 'fine_amount', 'fine_paid']
     date_hierarchy = 'loan_date'
+    list_select_related = ('book', 'member')
+    list_per_page = 50
+    show_full_result_count = False
+    
+    def get_queryset(self, request):
+        """Join book and member so list columns don't query per row."""
+        return super().get_queryset(request).select_related('book', 'member')
     
     def book_title(self, obj):
         """Display book title."""
@@ -95,23 +171,17 @@ class LoanAdmin(admin.ModelAdmin):
     
     def status_display(self, obj):
         """Display status with color coding."""
-        status_colors = {
-            'ACT': 'blue',
-            'RET': 'green',
-            'OVE': 'red',
-            'CAN': 'gray',
-        }
-        color = status_colors.get(obj.status, 'black')
-        status_text = dict(Loan.STATUS_CHOICES).get(obj.status, obj.status)
-        return format_html(f'<span style="color: {color};">{status_text}</span>')
+        color = _STATUS_COLOR_MAP.get(obj.status, 'black')
+        status_text = _STATUS_MAP.get(obj.status, obj.status)
+        return format_html('<span style="color: {};">{}</span>', color, status_text)
     status_display.short_description = 'Status'
     
     def fine_display(self, obj):
         """Display fine amount with color coding."""
         if obj.fine_amount > 0:
             if obj.fine_paid:
-                return format_html(f'<span style="color: green;">${obj.fine_amount} (Paid)</span>')
-            return format_html(f'<span style="color: red;">${obj.fine_amount}</span>')
+                return format_html('<span style="color: green;">${} (Paid)</span>', obj.fine_amount)
+            return format_html('<span style="color: red;">${}</span>', obj.fine_amount)
         return "$0.00"
     fine_display.short_description = 'Fine'
     
@@ -119,19 +189,44 @@ class LoanAdmin(admin.ModelAdmin):
     
     def mark_as_returned(self, request, queryset):
         """Admin action to mark loans as returned."""
-        updated = 0
-        for loan in queryset.filter(status='ACT'):
-            loan.mark_returned()
-            updated += 1
+        today = timezone.now().date()
+        with transaction.atomic():
+            # Lock the active loans so a concurrent return of the same
+            # selection waits here and then finds nothing left to return
+            rows = list(
+                queryset.filter(status='ACT').select_for_update()
+                .values_list('pk', 'book_id', 'member_id')
+            )
+            updated = Loan.objects.filter(pk__in=[pk for pk, _, _ in rows], status='ACT').update(
+                status='RET', return_date=today
+            )
+            
+            # Group by how many copies each book/member gets back so a selection
+            # touching the same book twice still issues one UPDATE per group.
+            # Least/Greatest keep the same clamping as Book.return_book() and
+            # Member.decrement_borrowed_count().
+            book_counts = Counter(book_id for _, book_id, _ in rows)
+            for count, book_ids in _group_by_count(book_counts).items():
+                Book.objects.filter(id__in=book_ids).update(
+                    available_copies=Least(F('available_copies') + count, F('quantity')),
+                    is_available=ExpressionWrapper(Q(quantity__gt=0), output_field=BooleanField()),
+                )
+            member_counts = Counter(member_id for _, _, member_id in rows)
+            for count, member_ids in _group_by_count(member_counts).items():
+                Member.objects.filter(id__in=member_ids).update(
+                    current_books_borrowed=Greatest(F('current_books_borrowed') - count, 0)
+                )
+        
+        # QuerySet.update() sends no post_save, so drop the cached pages here
+        invalidate_cached_pages()
         self.message_user(request, f'{updated} loan(s) marked as returned.')
     mark_as_returned.short_description = "Mark selected loans as returned"
     
     def calculate_fines(self, request, queryset):
         """Admin action to calculate fines for overdue loans."""
-        total_fines = 0
-        for loan in queryset.filter(status='OVE', fine_paid=False):
-            fine = loan.calculate_fine()
-            total_fines += fine
+        overdue = queryset.calculate_fines()
+        total_fines = overdue.aggregate(total=Sum('fine_amount'))['total'] or 0
+        invalidate_cached_pages()
         self.message_user(request, f'Calculated ${total_fines:.2f} in fines.')
     calculate_fines.short_description = "Calculate fines for selected loans"
 
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class LibraryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'library'
-    verbose_name = 'Library Management'
\ No newline at end of file
+    verbose_name = 'Library Management'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
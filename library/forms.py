@@ -2,16 +2,21 @@
 Forms for the Library Management System.
 """
 
+import re
+
 from django import forms
+from django.db.models import F
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 
 # Import models from your app(s)
-from .models import Book, Member, Loan
+from .models import Book, Member, Loan, ISBN_REGEX
 
 from datetime import date, timedelta
 
 
+_GENRE_CHOICES_WITH_ALL = (('', 'All Genres'),) + tuple(Book.GENRE_CHOICES)
+
 
 class BookForm(forms.ModelForm):
     """
@@ -29,8 +34,8 @@ class BookForm(forms.ModelForm):
     def clean_isbn(self):
         """Validate ISBN format."""
         isbn = self.cleaned_data.get('isbn')
-        if len(isbn) not in [10, 13]:
-            raise forms.ValidationError('ISBN must be 10 or 13 characters long.')
+        if not re.match(ISBN_REGEX, isbn):
+            raise forms.ValidationError('ISBN must be 10 or 13 digits long.')
         return isbn
     
     def clean_quantity(self):
@@ -61,6 +66,14 @@ class MemberForm(forms.ModelForm):
         return email
 
 
+class BookChoiceField(forms.ModelChoiceField):
+    """
+    Book dropdown that labels options from the title and author only.
+    """
+    def label_from_instance(self, obj):
+        return f"{obj.title} by {obj.author}"
+
+
 class LoanForm(forms.ModelForm):
     """
     Form for creating book loans.
@@ -68,6 +81,9 @@ class LoanForm(forms.ModelForm):
     class Meta:
         model = Loan
         fields = ['book', 'member', 'due_date']
+        field_classes = {
+            'book': BookChoiceField,
+        }
         widgets = {
             'due_date': forms.DateInput(attrs={'type': 'date'}),
         }
@@ -75,21 +91,20 @@ class LoanForm(forms.ModelForm):
    
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Only show available books
-        self.fields['book'].queryset = Book.objects.filter(available_copies__gt=0)
-        
-        # Only show active members who can borrow more
-        # Get members who are active and have borrowed less than their max allowed
-        active_members = Member.objects.filter(is_active=True)
-        
-        # Create a list of member IDs who have reached their borrowing limit
-        members_at_limit = []
-        for member in active_members:
-            if member.current_books_borrowed >= member.max_books_allowed:
-                members_at_limit.append(member.id)
+        # Only show available books, fetching just the columns the dropdown
+        # label, clean() and borrow_book() read
+        self.fields['book'].queryset = Book.objects.filter(is_available=True).only(
+            'id', 'title', 'author', 'available_copies', 'is_available'
+        )
         
-        # Exclude members who have reached their limit
-        self.fields['member'].queryset = active_members.exclude(id__in=members_at_limit)
+        # Only show active members who can borrow more, in a single query.
+        # clean() calls can_borrow_more() on the chosen member, so keep the
+        # fields it reads loaded alongside the ones used for the label.
+        self.fields['member'].queryset = Member.objects.filter(
+            is_active=True,
+            current_books_borrowed__lt=F('max_books_allowed'),
+        ).only('id', 'first_name', 'last_name', 'is_active',
+               'current_books_borrowed', 'max_books_allowed')
     
 
     def clean(self):
@@ -98,7 +113,7 @@ class LoanForm(forms.ModelForm):
         book = cleaned_data.get('book')
         member = cleaned_data.get('member')
         
-        if book and not book.is_available():
+        if book and not book.is_available:
             raise forms.ValidationError('This book is not available for loan.')
         
         if member and not member.can_borrow_more():
@@ -146,7 +161,7 @@ class SearchForm(forms.Form):
         widget=forms.TextInput(attrs={'placeholder': 'Search books...'})
     )
     genre = forms.ChoiceField(
-        choices=[('', 'All Genres')] + Book.GENRE_CHOICES,
+        choices=_GENRE_CHOICES_WITH_ALL,
         required=False
     )
     author = forms.CharField(max_length=100, required=False)
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-15 19:59
+
+from django.db import migrations, models
+
+
+def populate_is_available(apps, schema_editor):
+    Book = apps.get_model("library", "Book")
+    Book.objects.filter(available_copies=0).update(is_available=False)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("library", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="is_available",
+            field=models.BooleanField(
+                db_index=True,
+                default=True,
+                editable=False,
+                help_text="Whether any copies are available (kept in sync by save)",
+            ),
+        ),
+        migrations.RunPython(populate_is_available, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-15 20:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("library", "0002_book_is_available"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="loan",
+            index=models.Index(
+                fields=["status", "fine_paid"], name="loan_status_paid_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="loan",
+            index=models.Index(
+                fields=["status", "due_date"], name="loan_status_due_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="loan",
+            index=models.Index(
+                fields=["member", "status"], name="loan_member_status_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-15 20:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("library", "0003_loan_indexes"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="book",
+            constraint=models.CheckConstraint(
+                check=models.Q(("isbn__regex", "^([0-9]{9}[0-9X]|[0-9]{13})$")),
+                name="book_isbn_format",
+                violation_error_message="ISBN must be 10 or 13 digits long.",
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+"""
+Trigram GIN indexes backing the book search's icontains lookups.
+
+PostgreSQL only: Django compiles icontains to UPPER(col::text) LIKE UPPER(...),
+so the indexes are built on that expression. Other backends skip this
+migration.
+"""
+
+from django.db import migrations
+
+
+TRIGRAM_INDEXES = {
+    "book_title_trgm": "title",
+    "book_author_trgm": "author",
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON library_book "
+            f"USING gin ((UPPER({column}::text)) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("library", "0004_book_isbn_format"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,39 @@
+"""
+Full-text search index for book_list on PostgreSQL.
+
+The expression must match the SearchVector used in views.book_list so the
+planner can use it. Other backends skip this migration.
+"""
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def book_fts_index():
+    return GinIndex(
+        SearchVector("title", "description", "isbn", config="english"),
+        name="book_fts",
+    )
+
+
+def create_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.add_index(apps.get_model("library", "Book"), book_fts_index())
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.remove_index(apps.get_model("library", "Book"), book_fts_index())
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("library", "0005_book_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-15 21:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("library", "0006_book_fts"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(fields=["genre"], name="book_genre_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="member",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["is_active"],
+                name="member_active_idx",
+            ),
+        ),
+    ]
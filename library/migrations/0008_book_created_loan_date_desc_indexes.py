@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-15 21:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("library", "0007_book_genre_member_active_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(fields=["-created_at"], name="book_created_desc_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="loan",
+            index=models.Index(fields=["-loan_date"], name="loan_date_desc_idx"),
+        ),
+    ]
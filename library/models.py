@@ -2,11 +2,26 @@
 Models for the Library Management System.
 """
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, ExpressionWrapper, F, Q, Value, When
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from django.utils.functional import cached_property
 from datetime import timedelta
+from decimal import Decimal
+
+
+# 10-digit (optionally ending in an X check digit) or 13-digit ISBN
+ISBN_REGEX = r'^([0-9]{9}[0-9X]|[0-9]{13})$'
+
+class BookManager(models.Manager):
+    """
+    Manager for books; fixtures refer to books by ISBN.
+    """
+    def get_by_natural_key(self, isbn):
+        return self.get(isbn=isbn)
+
 
 class Book(models.Model):
     """
@@ -35,44 +50,77 @@ class Book(models.Model):
     description = models.TextField(blank=True)
     quantity = models.PositiveIntegerField(default=1, validators=[MinValueValidator(0)])
     available_copies = models.PositiveIntegerField(default=1, validators=[MinValueValidator(0)])
+    is_available = models.BooleanField(default=True, db_index=True, editable=False,
+                                       help_text='Whether any copies are available (kept in sync by save)')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = BookManager()
+    
     class Meta:
         ordering = ['title']
         verbose_name = 'Book'
         verbose_name_plural = 'Books'
+        indexes = [
+            models.Index(fields=['genre'], name='book_genre_idx'),
+            models.Index(fields=['-created_at'], name='book_created_desc_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=Q(isbn__regex=ISBN_REGEX),
+                name='book_isbn_format',
+                violation_error_message='ISBN must be 10 or 13 digits long.',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.title} by {self.author}"
     
+    def natural_key(self):
+        return (self.isbn,)
+    
     def save(self, *args, **kwargs):
-        """Override save to ensure available_copies doesn't exceed quantity."""
+        """Override save to clamp available_copies and keep is_available in sync."""
         if self.available_copies > self.quantity:
             self.available_copies = self.quantity
+        self.is_available = self.available_copies > 0
         super().save(*args, **kwargs)
     
-    def is_available(self):
-        """Check if book has available copies."""
-        return self.available_copies > 0
-    
     def borrow_book(self):
         """Decrement available copies when borrowed."""
-        if self.available_copies > 0:
-            self.available_copies -= 1
-            self.save()
+        # is_available is listed first so it is computed from the old count
+        # even on backends that evaluate SET assignments left to right.
+        updated = Book.objects.filter(pk=self.pk, available_copies__gt=0).update(
+            is_available=ExpressionWrapper(Q(available_copies__gt=1), output_field=models.BooleanField()),
+            available_copies=F('available_copies') - 1,
+        )
+        if updated:
+            self.available_copies = max(self.available_copies - 1, 0)
+            self.is_available = self.available_copies > 0
             return True
         return False
     
     def return_book(self):
         """Increment available copies when returned."""
-        if self.available_copies < self.quantity:
-            self.available_copies += 1
-            self.save()
+        updated = Book.objects.filter(pk=self.pk, available_copies__lt=F('quantity')).update(
+            available_copies=F('available_copies') + 1,
+            is_available=True,
+        )
+        if updated:
+            self.available_copies = min(self.available_copies + 1, self.quantity)
+            self.is_available = True
             return True
         return False
 
 
+class MemberManager(models.Manager):
+    """
+    Manager for members; fixtures refer to members by email.
+    """
+    def get_by_natural_key(self, email):
+        return self.get(email=email)
+
+
 class Member(models.Model):
     """
     Model representing a library member.
@@ -97,16 +145,25 @@ class Member(models.Model):
     current_books_borrowed = models.PositiveIntegerField(default=0, validators=[MinValueValidator(0)])
     is_active = models.BooleanField(default=True)
     
+    objects = MemberManager()
+    
     class Meta:
         ordering = ['last_name', 'first_name']
         verbose_name = 'Member'
         verbose_name_plural = 'Members'
+        indexes = [
+            models.Index(fields=['is_active'], condition=Q(is_active=True), name='member_active_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.first_name} {self.last_name}"
+        return self.full_name
     
-    @property
+    def natural_key(self):
+        return (self.email,)
+    
+    @cached_property
     def full_name(self):
+        # Cached per instance; delete the attribute after renaming a member
         return f"{self.first_name} {self.last_name}"
     
     def can_borrow_more(self):
@@ -115,21 +172,60 @@ class Member(models.Model):
     
     def increment_borrowed_count(self):
         """Increment count of borrowed books."""
-        if self.can_borrow_more():
+        updated = Member.objects.filter(
+            pk=self.pk,
+            is_active=True,
+            current_books_borrowed__lt=F('max_books_allowed'),
+        ).update(current_books_borrowed=F('current_books_borrowed') + 1)
+        if updated:
             self.current_books_borrowed += 1
-            self.save()
             return True
         return False
     
     def decrement_borrowed_count(self):
         """Decrement count of borrowed books."""
-        if self.current_books_borrowed > 0:
-            self.current_books_borrowed -= 1
-            self.save()
+        updated = Member.objects.filter(pk=self.pk, current_books_borrowed__gt=0).update(
+            current_books_borrowed=F('current_books_borrowed') - 1
+        )
+        if updated:
+            self.current_books_borrowed = max(self.current_books_borrowed - 1, 0)
             return True
         return False
 
 
+class LoanQuerySet(models.QuerySet):
+    """
+    QuerySet for loans with bulk fine calculation.
+    """
+    def calculate_fines(self):
+        """
+        Set fines on unpaid overdue loans in this queryset with one UPDATE.
+        
+        The fine only depends on the due date, so a CASE over the distinct due
+        dates works on every backend. Returns the queryset of fined loans.
+        """
+        today = timezone.now().date()
+        overdue = self.filter(status='OVE', fine_paid=False, due_date__lt=today)
+        due_dates = overdue.order_by().values_list('due_date', flat=True).distinct()
+        whens = [
+            When(due_date=due_date, then=Value(Decimal((today - due_date).days)))  # $1 per day
+            for due_date in due_dates
+        ]
+        if whens:
+            overdue.update(fine_amount=Case(
+                *whens, output_field=models.DecimalField(max_digits=6, decimal_places=2)
+            ))
+        return overdue
+
+
+class LoanManager(models.Manager.from_queryset(LoanQuerySet)):
+    """
+    Default manager for loans that always joins the book and member.
+    """
+    def get_queryset(self):
+        return super().get_queryset().select_related('book', 'member')
+
+
 class Loan(models.Model):
     """
     Model representing a book loan transaction.
@@ -151,11 +247,19 @@ class Loan(models.Model):
     fine_paid = models.BooleanField(default=False)
     notes = models.TextField(blank=True)
     
+    objects = LoanManager()
+    
     class Meta:
         ordering = ['-loan_date']
         verbose_name = 'Loan'
         verbose_name_plural = 'Loans'
         unique_together = ['book', 'member', 'loan_date']
+        indexes = [
+            models.Index(fields=['status', 'fine_paid'], name='loan_status_paid_idx'),
+            models.Index(fields=['status', 'due_date'], name='loan_status_due_idx'),
+            models.Index(fields=['member', 'status'], name='loan_member_status_idx'),
+            models.Index(fields=['-loan_date'], name='loan_date_desc_idx'),
+        ]
     
     def __str__(self):
         return f"{self.book.title} loaned to {self.member.full_name}"
@@ -173,26 +277,47 @@ class Loan(models.Model):
         
         super().save(*args, **kwargs)
     
-    def calculate_fine(self):
-        """Calculate fine if book is overdue."""
+    def calculate_fine(self, save=True):
+        """
+        Calculate fine if book is overdue.
+        
+        Pass save=False to only set fine_amount, e.g. to flush many loans at
+        once with Loan.objects.bulk_update(loans, ['fine_amount']).
+        """
         if self.status == 'OVE' and not self.fine_paid:
             days_overdue = (timezone.now().date() - self.due_date).days
             if days_overdue > 0:
                 self.fine_amount = days_overdue * 1.00  # $1 per day
-                self.save()
+                if save:
+                    self.save()
                 return self.fine_amount
         return 0.00
     
     def mark_returned(self):
-        """Mark loan as returned."""
-        self.return_date = timezone.now().date()
+        """
+        Mark loan as returned.
+        
+        Uses conditional UPDATEs rather than save() on the loan, book and
+        member, so self.book and self.member are not refreshed in memory.
+        """
+        today = timezone.now().date()
+        Loan.objects.filter(pk=self.pk).update(return_date=today, status='RET')
+        self.return_date = today
         self.status = 'RET'
-        self.save()
         
         # Update book availability
-        self.book.return_book()
+        Book.objects.filter(pk=self.book_id, available_copies__lt=F('quantity')).update(
+            available_copies=F('available_copies') + 1,
+            is_available=True,
+        )
         
         # Update member's borrowed count
-        self.member.decrement_borrowed_count()
+        Member.objects.filter(pk=self.member_id, current_books_borrowed__gt=0).update(
+            current_books_borrowed=F('current_books_borrowed') - 1
+        )
+        
+        # The UPDATEs above send no post_save; signals.py imports this module
+        from .signals import invalidate_cached_pages
+        transaction.on_commit(invalidate_cached_pages)
         
-        return True
\ No newline at end of file
+        return True
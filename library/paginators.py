@@ -0,0 +1,34 @@
+"""
+Paginators for the library app.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import Paginator
+from django.db import OperationalError, connection, transaction
+from django.utils.functional import cached_property
+
+
+class TimeLimitedPaginator(Paginator):
+    """
+    Paginator whose COUNT(*) is cut off after a short timeout on PostgreSQL.
+    
+    If the count times out, a large sentinel is used instead so the page
+    still renders; templates should iterate an elided page range.
+    """
+    timeout_ms = 200
+    fallback_count = 9999999999
+    
+    @cached_property
+    def count(self):
+        if connection.vendor != 'postgresql':
+            return super().count
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(f'SET LOCAL statement_timeout = {int(self.timeout_ms)}')
+                return super().count
+        except OperationalError:
+            return self.fallback_count
+    
+    async def acount(self):
+        """Compute (and cache) the count from async code."""
+        return await sync_to_async(lambda: self.count)()
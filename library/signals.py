@@ -0,0 +1,38 @@
+"""
+Signal handlers for the library app.
+"""
+
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Book, Member, Loan
+
+HOME_STATS_CACHE_KEY = 'lib:home_stats'
+PAGE_CACHE_VERSION_KEY = 'lib:page_version'
+
+
+def invalidate_cached_pages():
+    """
+    Drop cached counts and pages.
+    
+    Saves and deletes call this through the receiver below; code that writes
+    with QuerySet.update() (which sends no signals) must call it itself, via
+    transaction.on_commit() when inside a transaction.
+    """
+    cache.delete(HOME_STATS_CACHE_KEY)
+    # Cached pages are keyed on this version, so a new one orphans them all
+    cache.set(PAGE_CACHE_VERSION_KEY, uuid4().hex, None)
+
+
+@receiver([post_save, post_delete], sender=Book)
+@receiver([post_save, post_delete], sender=Member)
+@receiver([post_save, post_delete], sender=Loan)
+def invalidate_on_change(sender, **kwargs):
+    """Drop cached counts and pages when a book, member or loan changes."""
+    # Wait for the commit: invalidating mid-transaction would let a concurrent
+    # request cache the old data under the new version
+    transaction.on_commit(invalidate_cached_pages)
@@ -2,7 +2,10 @@
 Custom template filters for the library app.
 """
 
+from numbers import Number
+
 from django import template
+from django.db.models import Sum
 
 register = template.Library()
 
@@ -14,6 +17,11 @@ def get_item(dictionary, key):
 @register.filter
 def multiply(value, arg):
     """Multiply the value by the argument."""
+    if isinstance(value, Number) and isinstance(arg, Number):
+        try:
+            return value * arg
+        except TypeError:  # e.g. Decimal * float
+            pass
     try:
         return float(value) * float(arg)
     except (ValueError, TypeError):
@@ -22,6 +30,13 @@ def multiply(value, arg):
 @register.filter
 def divide(value, arg):
     """Divide the value by the argument."""
+    if isinstance(value, Number) and isinstance(arg, Number):
+        try:
+            return value / arg
+        except TypeError:
+            pass
+        except ArithmeticError:
+            return 0
     try:
         return float(value) / float(arg)
     except (ValueError, TypeError, ZeroDivisionError):
@@ -30,6 +45,13 @@ def divide(value, arg):
 @register.filter
 def percentage(value, total):
     """Calculate percentage."""
+    if isinstance(value, Number) and isinstance(total, Number):
+        try:
+            return (value / total) * 100
+        except TypeError:
+            pass
+        except ArithmeticError:
+            return 0
     try:
         return (float(value) / float(total)) * 100
     except (ValueError, TypeError, ZeroDivisionError):
@@ -42,14 +64,23 @@ def add_str(value, arg):
 
 @register.filter
 def filter_by_status(queryset, status):
-    """Filter loans by status."""
-    if hasattr(queryset, 'filter'):
-        return queryset.filter(status=status)
+    """
+    Filter loans by status.
+    
+    Filters in Python so a related manager reuses its prefetch_related('loans')
+    cache instead of issuing a fresh query; views should prefetch the loans.
+    """
+    if hasattr(queryset, 'all'):
+        return [item for item in queryset.all() if item.status == status]
     return []
 
 @register.filter
 def total_fines(queryset):
     """Calculate total unpaid fines."""
+    if hasattr(queryset, 'aggregate'):
+        total = queryset.filter(fine_paid=False).aggregate(total=Sum('fine_amount'))['total'] or 0
+        return f"{total:.2f}"
+    
     total = 0
     for item in queryset:
         if hasattr(item, 'fine_amount') and hasattr(item, 'fine_paid'):
@@ -23,6 +23,7 @@ urlpatterns = [
     
     # Loan URLs
     path('loans/', views.loan_list, name='loan_list'),
+    path('loans/export/', views.loan_list_csv, name='loan_list_csv'),
     path('loans/new/', views.loan_create, name='loan_create'),
     path('loans/<int:pk>/return/', views.loan_return, name='loan_return'),
 ]
\ No newline at end of file
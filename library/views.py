@@ -2,47 +2,145 @@
 Views for the Library Management System.
 """
 
+import asyncio
+import csv
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Count, Sum
+from django.core.cache import cache
+from django.middleware.cache import CacheMiddleware
+from django.db.models import Q, Count, Prefetch, Sum
+from django.db.models.functions import Substr
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
 from django.core.paginator import Paginator
+from django.db import connection, transaction
 from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
 from datetime import timedelta
 from .models import Book, Member, Loan
 from .forms import BookForm, MemberForm, LoanForm, ReturnForm, SearchForm
+from .paginators import TimeLimitedPaginator
+from .signals import HOME_STATS_CACHE_KEY, PAGE_CACHE_VERSION_KEY
+
+
+HOME_STATS_TIMEOUT = 60  # seconds
+PAGE_CACHE_TIMEOUT = 60  # seconds
+
+_GENRES = Book.GENRE_CHOICES
+_MEMBERSHIPS = Member.MEMBERSHIP_CHOICES
+_STATUSES = Loan.STATUS_CHOICES
+
+# Must match the book_fts index expression (migration 0006)
+_BOOK_SEARCH_VECTOR = SearchVector('title', 'description', 'isbn', config='english')
+
+# Templates may still touch the database (request.user, related managers),
+# so async views render in a worker thread.
+_arender = sync_to_async(render)
+
 
+async def _aget_object_or_404(queryset, **kwargs):
+    """Async get_object_or_404, which Django 4.2 doesn't provide."""
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
 
-def home(request):
+
+async def _alist(queryset):
+    """Evaluate a queryset into a list without blocking the event loop."""
+    return [obj async for obj in queryset]
+
+
+def _cache_page(timeout):
+    """
+    cache_page for async views; Django 4.2's decorator only wraps sync views.
+    
+    Entries are keyed on the page-cache version that signals.py replaces
+    whenever a book, member or loan is saved or deleted, or a bulk update
+    calls invalidate_cached_pages(), so edits show up immediately. Only the
+    server keeps a copy: browsers are told not to cache the pages, since the
+    version bump can't reach them.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        async def _wrapper_view(request, *args, **kwargs):
+            version = await cache.aget(PAGE_CACHE_VERSION_KEY, '0')
+            middleware = CacheMiddleware(
+                view_func, page_timeout=timeout, key_prefix=f'lib:pages:{version}'
+            )
+            response = await sync_to_async(middleware.process_request)(request)
+            if response is None:
+                response = await view_func(request, *args, **kwargs)
+                # Pages show the logged-in user, so never share them across sessions
+                patch_vary_headers(response, ('Cookie',))
+                response = await sync_to_async(middleware.process_response)(request, response)
+            # Both the fresh response and a cache hit carry the max-age/Expires
+            # CacheMiddleware adds; the stored copy was pickled already, and
+            # must stay public or CacheMiddleware won't store it
+            response.headers.pop('Expires', None)
+            patch_cache_control(response, private=True, max_age=0)
+            return response
+        return _wrapper_view
+    return decorator
+
+
+async def _home_stats():
+    """Count books, active members and active/overdue loans for the dashboard."""
+    # Cached briefly; saves and deletes also invalidate it (see signals.py)
+    stats = await cache.aget(HOME_STATS_CACHE_KEY)
+    if stats is None:
+        total_books, total_members, active_loans, overdue_loans = await asyncio.gather(
+            Book.objects.acount(),
+            Member.objects.filter(is_active=True).acount(),
+            Loan.objects.filter(status='ACT').acount(),
+            Loan.objects.filter(status='OVE').acount(),
+        )
+        stats = {
+            'total_books': total_books,
+            'total_members': total_members,
+            'active_loans': active_loans,
+            'overdue_loans': overdue_loans,
+        }
+        await cache.aset(HOME_STATS_CACHE_KEY, stats, HOME_STATS_TIMEOUT)
+    return stats
+
+
+@_cache_page(PAGE_CACHE_TIMEOUT)
+async def home(request):
     """
     Home page view showing library statistics.
     """
-    total_books = Book.objects.count()
-    total_members = Member.objects.filter(is_active=True).count()
-    active_loans = Loan.objects.filter(status='ACT').count()
-    overdue_loans = Loan.objects.filter(status='OVE').count()
-    
-    # Recent additions
-    recent_books = Book.objects.order_by('-created_at')[:5]
-    recent_loans = Loan.objects.select_related('book', 'member').order_by('-loan_date')[:5]
+    stats, recent_books, recent_loans = await asyncio.gather(
+        _home_stats(),
+        _alist(Book.objects.order_by('-created_at')[:5]),
+        _alist(Loan.objects.select_related('book', 'member').order_by('-loan_date')[:5]),
+    )
     
     context = {
-        'total_books': total_books,
-        'total_members': total_members,
-        'active_loans': active_loans,
-        'overdue_loans': overdue_loans,
+        **stats,
         'recent_books': recent_books,
         'recent_loans': recent_loans,
     }
-    return render(request, 'index.html', context)
+    return await _arender(request, 'index.html', context)
 
 
 # Book Views
-def book_list(request):
+@_cache_page(PAGE_CACHE_TIMEOUT)
+async def book_list(request):
     """
     List all books with search and filter functionality.
     """
-    books = Book.objects.all()
+    # Only the columns the list shows; the (possibly long) description is
+    # cut down in SQL to what the card's truncatechars:80 needs
+    books = Book.objects.only(
+        'id', 'title', 'author', 'isbn', 'genre', 'published_date',
+        'available_copies', 'is_available',
+    ).annotate(description_excerpt=Substr('description', 1, 81))
     search_form = SearchForm(request.GET)
     
     if search_form.is_valid():
@@ -51,11 +149,19 @@ def book_list(request):
         author = search_form.cleaned_data.get('author')
         
         if query:
-            books = books.filter(
-                Q(title__icontains=query) |
-                Q(description__icontains=query) |
-                Q(isbn__icontains=query)
-            )
+            if connection.vendor == 'postgresql':
+                # Ranked full-text search backed by the book_fts GIN index
+                search_query = SearchQuery(query, config='english')
+                books = books.annotate(
+                    search=_BOOK_SEARCH_VECTOR,
+                    rank=SearchRank(_BOOK_SEARCH_VECTOR, search_query),
+                ).filter(search=search_query).order_by('-rank')
+            else:
+                books = books.filter(
+                    Q(title__icontains=query) |
+                    Q(description__icontains=query) |
+                    Q(isbn__icontains=query)
+                )
         
         if genre:
             books = books.filter(genre=genre)
@@ -64,30 +170,42 @@ def book_list(request):
             books = books.filter(author__icontains=author)
     
     # Pagination
-    paginator = Paginator(books, 10)  # 10 books per page
+    paginator = TimeLimitedPaginator(books, 10)  # 10 books per page
+    await paginator.acount()
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    page_obj.object_list = [book async for book in page_obj.object_list]
+    # Only the pages around the current one, so a timed-out count stays cheap
+    page_range = [
+        num for num in paginator.get_elided_page_range(page_obj.number, on_each_side=2, on_ends=0)
+        if num != paginator.ELLIPSIS and abs(num - page_obj.number) <= 2
+    ]
     
     context = {
         'page_obj': page_obj,
+        'page_range': page_range,
         'search_form': search_form,
-        'genres': Book.GENRE_CHOICES,
+        'genres': _GENRES,
     }
-    return render(request, 'books/book_list.html', context)
+    return await _arender(request, 'books/book_list.html', context)
 
 
-def book_detail(request, pk):
+@_cache_page(PAGE_CACHE_TIMEOUT)
+async def book_detail(request, pk):
     """
     View details of a specific book.
     """
-    book = get_object_or_404(Book, pk=pk)
-    loan_history = book.loans.select_related('member').order_by('-loan_date')[:10]
+    book = await _aget_object_or_404(Book.objects.all(), pk=pk)
+    loan_history = [
+        loan async for loan in
+        book.loans.select_related('member').order_by('-loan_date')[:10]
+    ]
     
     context = {
         'book': book,
         'loan_history': loan_history,
     }
-    return render(request, 'books/book_detail.html', context)
+    return await _arender(request, 'books/book_detail.html', context)
 
 
 @login_required
@@ -159,17 +277,21 @@ def book_delete(request, pk):
 
 
 # Member Views
-def member_list(request):
+@_cache_page(PAGE_CACHE_TIMEOUT)
+async def member_list(request):
     """
     List all members.
     """
-    members = Member.objects.all().order_by('last_name', 'first_name')
+    members = [
+        member async for member in
+        Member.objects.all().order_by('last_name', 'first_name')
+    ]
     
     context = {
         'members': members,
-        'membership_types': Member.MEMBERSHIP_CHOICES,
+        'membership_types': _MEMBERSHIPS,
     }
-    return render(request, 'members/member_list.html', context)
+    return await _arender(request, 'members/member_list.html', context)
 
 
 def member_detail(request, pk):
@@ -177,8 +299,12 @@ def member_detail(request, pk):
     View details of a specific member.
     """
     member = get_object_or_404(Member, pk=pk)
-    current_loans = member.loans.filter(status='ACT').select_related('book')
-    loan_history = member.loans.exclude(status='ACT').select_related('book').order_by('-loan_date')[:10]
+    # Join only the book; LoanManager's default member join would repeat the
+    # member on every row. The history stays a LIMIT 10 query so the page
+    # doesn't grow with the member's whole borrowing record.
+    loans = member.loans.select_related(None).select_related('book')
+    current_loans = loans.filter(status='ACT')
+    loan_history = loans.exclude(status='ACT').order_by('-loan_date')[:10]
     
     context = {
         'member': member,
@@ -259,37 +385,80 @@ def loan_list(request):
         loans = loans.filter(status=status_filter)
     
     # Calculate fines for overdue loans
-    for loan in loans.filter(status='OVE'):
-        loan.calculate_fine()
+    loans.calculate_fines()
     
     # Calculate statistics
-    total_loans = loans.count()
+    stats = loans.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(status='ACT')),
+        overdue=Count('id', filter=Q(status='OVE')),
+        fines=Sum('fine_amount', filter=Q(status='OVE', fine_paid=False)),
+    )
     
-    # Count active loans
-    active_count = 0
-    overdue_count = 0
-    total_fines = 0
-    
-    for loan in loans:
-        if loan.status == 'ACT':
-            active_count += 1
-        elif loan.status == 'OVE':
-            overdue_count += 1
-            if not loan.fine_paid:
-                total_fines += float(loan.fine_amount)
+    # Pagination, fetching only the columns the table shows
+    loans = loans.only(
+        'id', 'status', 'loan_date', 'due_date', 'fine_amount', 'fine_paid',
+        'book__id', 'book__title', 'member__id', 'member__first_name', 'member__last_name',
+    ).order_by('-loan_date')
+    paginator = Paginator(loans, 25)  # 25 loans per page
+    paginator.count = stats['total']  # already counted above
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
     
     context = {
-        'loans': loans,
-        'status_choices': Loan.STATUS_CHOICES,
+        'page_obj': page_obj,
+        'status_choices': _STATUSES,
         'current_status': status_filter,
-        'total_loans': total_loans,
-        'active_loans': active_count,
-        'overdue_loans': overdue_count,
-        'total_fines': f"{total_fines:.2f}",
+        'total_loans': stats['total'],
+        'active_loans': stats['active'],
+        'overdue_loans': stats['overdue'],
+        'total_fines': f"{stats['fines'] or 0:.2f}",
     }
     return render(request, 'loans/loan_list.html', context)
 
 
+class _Echo:
+    """File-like object whose write() returns the value, for streaming csv rows."""
+    def write(self, value):
+        return value
+
+
+@login_required
+def loan_list_csv(request):
+    """
+    Stream loans as CSV without loading them all into memory.
+    """
+    status_filter = request.GET.get('status', '')
+    
+    loans = Loan.objects.select_related('book', 'member').order_by('-loan_date')
+    if status_filter:
+        loans = loans.filter(status=status_filter)
+    
+    writer = csv.writer(_Echo())
+    
+    header = ['id', 'book', 'member', 'status', 'due_date']
+    
+    def row(loan):
+        return [loan.id, loan.book.title, loan.member.full_name, loan.status, loan.due_date]
+    
+    def rows():
+        yield writer.writerow(header)
+        for loan in loans.iterator(chunk_size=2000):
+            yield writer.writerow(row(loan))
+    
+    async def arows():
+        yield writer.writerow(header)
+        async for loan in loans.aiterator(chunk_size=2000):
+            yield writer.writerow(row(loan))
+    
+    # Each server streams only its own kind of iterator; handed the other
+    # kind, StreamingHttpResponse reads it all into a list first
+    content = arows() if isinstance(request, ASGIRequest) else rows()
+    response = StreamingHttpResponse(content, content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename="loans.csv"'
+    return response
+
+
 @login_required
 def loan_create(request):
     """
@@ -299,20 +468,26 @@ def loan_create(request):
         form = LoanForm(request.POST)
         if form.is_valid():
             loan = form.save(commit=False)
+            error = None
             
-            # Update book availability
-            if loan.book.borrow_book():
-                # Update member's borrowed count
-                if loan.member.increment_borrowed_count():
-                    loan.save()
-                    messages.success(request, f'Book "{loan.book.title}" loaned to {loan.member.full_name} successfully!')
-                    return redirect('loan_list')
+            # Lock the book and member rows so concurrent loans are serialized;
+            # any failure below rolls the whole loan back
+            with transaction.atomic():
+                loan.book = Book.objects.select_for_update().get(pk=loan.book_id)
+                loan.member = Member.objects.select_for_update().get(pk=loan.member_id)
+                
+                if not loan.book.borrow_book():
+                    error = 'Book is not available for loan.'
+                elif not loan.member.increment_borrowed_count():
+                    error = 'Member cannot borrow more books.'
+                    transaction.set_rollback(True)
                 else:
-                    # Rollback book borrow if member can't borrow
-                    loan.book.return_book()
-                    messages.error(request, 'Member cannot borrow more books.')
-            else:
-                messages.error(request, 'Book is not available for loan.')
+                    loan.save()
+            
+            if error is None:
+                messages.success(request, f'Book "{loan.book.title}" loaned to {loan.member.full_name} successfully!')
+                return redirect('loan_list')
+            messages.error(request, error)
     else:
         form = LoanForm()
     
@@ -325,35 +500,51 @@ def loan_return(request, pk):
     """
     Return a book loan.
     """
-    loan = get_object_or_404(Loan, pk=pk)
-    
     if request.method == 'POST':
-        form = ReturnForm(request.POST, loan=loan)
+        form = ReturnForm(request.POST)
         if form.is_valid():
-            # Mark loan as returned
-            loan.return_date = timezone.now().date()
-            loan.status = 'RET'
-            loan.notes = form.cleaned_data.get('return_notes', '')
-            
-            # Handle fine payment if overdue
-            if loan.status == 'OVE' and request.POST.get('mark_fine_paid'):
-                loan.fine_paid = True
-            
-            loan.save()
-            
-            # Update book availability
-            loan.book.available_copies += 1
-            loan.book.save()
+            error = None
             
-            # Update member's borrowed count
-            if loan.member.current_books_borrowed > 0:
-                loan.member.current_books_borrowed -= 1
-                loan.member.save()
+            with transaction.atomic():
+                # Fetch and lock the loan along with its joined book and member
+                # rows; a valid POST needs no other read of the loan
+                loan = get_object_or_404(Loan.objects.select_for_update(), pk=pk)
+                form.loan = loan
+                
+                # A repeated or concurrent submit sees the loan already
+                # returned once the lock is released and must not count it again
+                if loan.status not in ('ACT', 'OVE'):
+                    error = f'This loan is already {loan.get_status_display().lower()}.'
+                else:
+                    was_overdue = loan.status == 'OVE'
+                    
+                    # Mark loan as returned
+                    loan.return_date = timezone.now().date()
+                    loan.status = 'RET'
+                    loan.notes = form.cleaned_data.get('return_notes', '')
+                    
+                    # Handle fine payment if overdue
+                    if was_overdue and request.POST.get('mark_fine_paid'):
+                        loan.fine_paid = True
+                    
+                    loan.save()
+                    
+                    # Update book availability and the member's borrowed count
+                    # with conditional F() UPDATEs (no read-modify-write)
+                    loan.book.return_book()
+                    loan.member.decrement_borrowed_count()
             
-            messages.success(request, f'Book "{loan.book.title}" returned successfully!')
+            if error is None:
+                messages.success(request, f'Book "{loan.book.title}" returned successfully!')
+            else:
+                messages.error(request, error)
             return redirect('loan_list')
     else:
-        form = ReturnForm(loan=loan)
+        form = ReturnForm()
+    
+    # Only rendering the page needs the loan (with book and member joined)
+    loan = get_object_or_404(Loan, pk=pk)
+    form.loan = loan
     
     context = {
         'form': form,
@@ -362,16 +553,23 @@ def loan_return(request, pk):
     return render(request, 'loans/loan_return.html', context)
 
 
-def book_availability(request, pk):
+@_cache_page(PAGE_CACHE_TIMEOUT)
+async def book_availability(request, pk):
     """
     Check book availability and due dates.
     """
-    book = get_object_or_404(Book, pk=pk)
-    active_loans = book.loans.filter(status='ACT').select_related('member')
+    book = await _aget_object_or_404(
+        Book.objects.prefetch_related(Prefetch(
+            'loans',
+            queryset=Loan.objects.filter(status='ACT').select_related('member'),
+            to_attr='active_loans',
+        )),
+        pk=pk,
+    )
     
     context = {
         'book': book,
-        'active_loans': active_loans,
+        'active_loans': book.active_loans,
     }
-    return render(request, 'books/book_availability.html', context)
+    return await _arender(request, 'books/book_availability.html', context)
 
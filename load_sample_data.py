@@ -4,239 +4,106 @@ Script to load sample data for the Library Management System.
 Run with: python load_sample_data.py
 """
 
+import json
 import os
 import sys
 import django
-from datetime import date, timedelta
-from django.utils import timezone
+from datetime import date
 
 # Add the project directory to Python path
 project_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_dir)
 
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'library_management.settings')
-try:
-    django.setup()
-except Exception as e:
-    print(f"Error setting up Django: {e}")
-    sys.exit(1)
+SAMPLE_FIXTURE = os.path.join(project_dir, 'library', 'fixtures', 'sample.json')
+# The day the fixture's loan and due dates were written relative to; loaded
+# loans are shifted by however long ago that was
+SAMPLE_FIXTURE_DATE = date(2026, 10, 15)
+
+
+def create_admin_user(report):
+    """Create the admin superuser if it doesn't exist yet."""
+    from django.contrib.auth.models import User
+    
+    if User.objects.filter(username='admin').exists():
+        return
+    report.append("Creating admin user...")
+    try:
+        User.objects.create_superuser(
+            username='admin',
+            email='admin@library.com',
+            password='admin123'
+        )
+        report.append("✓ Admin user created")
+    except Exception as e:
+        report.append(f"Error creating admin: {e}")
 
-from django.contrib.auth.models import User
-from library.models import Book, Member, Loan
 
 def create_sample_data():
     """Create sample data for the library system."""
+    from django.core.management import call_command
+    from django.db import transaction
+    from django.utils import timezone
+    from library.models import Book, Member, Loan
     
     print("Starting to create sample data...")
     
-    # Clear existing data (optional - remove if you want to keep existing data)
-    # Book.objects.all().delete()
-    # Member.objects.all().delete()
-    # Loan.objects.all().delete()
+    # Per-row messages are collected here and written out in one go at the
+    # end rather than flushing stdout for every row
+    report = []
     
-    # Create a superuser if doesn't exist
-    if not User.objects.filter(username='admin').exists():
-        print("Creating admin user...")
-        try:
-            User.objects.create_superuser(
-                username='admin',
-                email='admin@library.com',
-                password='admin123'
-            )
-            print("✓ Admin user created")
-        except Exception as e:
-            print(f"Error creating admin: {e}")
+    create_admin_user(report)
     
-    # Create sample books
-    books_data = [
-        {
-            'title': 'The Great Gatsby',
-            'author': 'F. Scott Fitzgerald',
-            'isbn': '9780743273565',
-            'genre': 'FIC',
-            'published_date': date(1925, 4, 10),
-            'publisher': "Charles Scribner's Sons",
-            'description': 'A classic novel of the Jazz Age.',
-            'quantity': 5,
-            'available_copies': 3,
-        },
-        {
-            'title': 'To Kill a Mockingbird',
-            'author': 'Harper Lee',
-            'isbn': '9780061120084',
-            'genre': 'FIC',
-            'published_date': date(1960, 7, 11),
-            'publisher': 'J. B. Lippincott & Co.',
-            'description': 'A novel about racial injustice in the American South.',
-            'quantity': 3,
-            'available_copies': 2,
-        },
-        {
-            'title': '1984',
-            'author': 'George Orwell',
-            'isbn': '9780451524935',
-            'genre': 'FIC',
-            'published_date': date(1949, 6, 8),
-            'publisher': 'Secker & Warburg',
-            'description': 'A dystopian social science fiction novel.',
-            'quantity': 4,
-            'available_copies': 4,
-        },
-        {
-            'title': 'Pride and Prejudice',
-            'author': 'Jane Austen',
-            'isbn': '9780141439518',
-            'genre': 'ROM',
-            'published_date': date(1813, 1, 28),
-            'publisher': 'T. Egerton',
-            'description': 'A romantic novel of manners.',
-            'quantity': 3,
-            'available_copies': 1,
-        },
-        {
-            'title': 'The Hobbit',
-            'author': 'J.R.R. Tolkien',
-            'isbn': '9780547928227',
-            'genre': 'FAN',
-            'published_date': date(1937, 9, 21),
-            'publisher': 'George Allen & Unwin',
-            'description': 'Fantasy novel and childrens book.',
-            'quantity': 6,
-            'available_copies': 4,
-        },
-    ]
+    # Books, members and loans live in library/fixtures/sample.json, with no
+    # primary keys; loans refer to their book and member by ISBN and email.
+    # Loading it over existing sample rows would overwrite them, so leave the
+    # database alone if any of them are already there.
+    with open(SAMPLE_FIXTURE) as f:
+        fixture = json.load(f)
+    isbns = [obj['fields']['isbn'] for obj in fixture if obj['model'] == 'library.book']
+    emails = [obj['fields']['email'] for obj in fixture if obj['model'] == 'library.member']
     
-    books_created = 0
-    for book_data in books_data:
-        book, created = Book.objects.get_or_create(
-            isbn=book_data['isbn'],
-            defaults=book_data
-        )
-        if created:
-            books_created += 1
-            print(f"✓ Created book: {book.title}")
-        else:
-            print(f"Book already exists: {book.title}")
+    if (Book.objects.filter(isbn__in=isbns).exists()
+            or Member.objects.filter(email__in=emails).exists()):
+        report.append("Sample books or members already exist, not loading sample.json")
+    else:
+        with transaction.atomic():
+            # Book.save() and auto_now_add don't run for fixtures, so book
+            # availability and loan dates come from the file as-is
+            call_command('loaddata', 'sample.json', verbosity=0)
+            
+            # Keep active loans current and overdue ones overdue
+            shift = timezone.now().date() - SAMPLE_FIXTURE_DATE
+            loans = list(Loan.objects.filter(member__email__in=emails))
+            for loan in loans:
+                loan.loan_date += shift
+                loan.due_date += shift
+            Loan.objects.bulk_update(loans, ['loan_date', 'due_date'])
+        report.append(f"✓ Loaded {len(isbns)} books, {len(emails)} members and {len(loans)} loans")
     
-    # Create sample members
-    members_data = [
-        {
-            'first_name': 'John',
-            'last_name': 'Smith',
-            'email': 'john.smith@email.com',
-            'phone': '555-0101',
-            'address': '123 Main St, Anytown',
-            'membership_type': 'REG',
-            'max_books_allowed': 5,
-            'current_books_borrowed': 2,
-            'is_active': True,
-        },
-        {
-            'first_name': 'Jane',
-            'last_name': 'Doe',
-            'email': 'jane.doe@email.com',
-            'phone': '555-0102',
-            'address': '456 Oak Ave, Somewhere',
-            'membership_type': 'PRE',
-            'max_books_allowed': 15,
-            'current_books_borrowed': 0,
-            'is_active': True,
-        },
-        {
-            'first_name': 'Robert',
-            'last_name': 'Johnson',
-            'email': 'robert.johnson@email.com',
-            'phone': '555-0103',
-            'address': '789 Pine Rd, Nowhere',
-            'membership_type': 'STU',
-            'max_books_allowed': 10,
-            'current_books_borrowed': 5,
-            'is_active': True,
-        },
+    report += [
+        "\n" + "="*50,
+        "SAMPLE DATA CREATION SUMMARY",
+        "="*50,
+        f"Books: {Book.objects.count()}",
+        f"Members: {Member.objects.count()}",
+        f"Loans: {Loan.objects.count()}",
+        "\nAdmin credentials (if created):",
+        "Username: admin",
+        "Password: admin123",
+        "="*50,
+        "\nYou can now:",
+        "1. Visit http://127.0.0.1:8000 to see the library dashboard",
+        "2. Login to admin at http://127.0.0.1:8000/admin with above credentials",
+        "3. Check the Books, Members, and Loans sections",
     ]
-    
-    members_created = 0
-    for member_data in members_data:
-        member, created = Member.objects.get_or_create(
-            email=member_data['email'],
-            defaults=member_data
-        )
-        if created:
-            members_created += 1
-            print(f"✓ Created member: {member.full_name}")
-        else:
-            print(f"Member already exists: {member.full_name}")
-    
-    # Get the created books and members
-    books = Book.objects.all()
-    members = Member.objects.all()
-    
-    # Create sample loans
-    loans_data = [
-        {
-            'book': books[0],  # The Great Gatsby
-            'member': members[0],  # John Smith
-            'loan_date': timezone.now().date() - timedelta(days=5),
-            'due_date': timezone.now().date() + timedelta(days=9),
-            'status': 'ACT',
-        },
-        {
-            'book': books[1],  # To Kill a Mockingbird
-            'member': members[0],  # John Smith
-            'loan_date': timezone.now().date() - timedelta(days=10),
-            'due_date': timezone.now().date() + timedelta(days=4),
-            'status': 'ACT',
-        },
-        {
-            'book': books[2],  # 1984
-            'member': members[2],  # Robert Johnson
-            'loan_date': timezone.now().date() - timedelta(days=20),
-            'due_date': timezone.now().date() - timedelta(days=6),
-            'status': 'OVE',
-            'fine_amount': 6.00,
-        },
-    ]
-    
-    loans_created = 0
-    for loan_data in loans_data:
-        # Check if loan already exists
-        existing_loan = Loan.objects.filter(
-            book=loan_data['book'],
-            member=loan_data['member'],
-            loan_date=loan_data['loan_date']
-        ).first()
-        
-        if not existing_loan:
-            try:
-                loan = Loan.objects.create(**loan_data)
-                loans_created += 1
-                print(f"✓ Created loan: {loan.book.title} → {loan.member.full_name}")
-                
-                # Update book availability for active loans
-                if loan.status == 'ACT':
-                    if loan.book.available_copies > 0:
-                        loan.book.available_copies -= 1
-                        loan.book.save()
-            except Exception as e:
-                print(f"Error creating loan: {e}")
-        else:
-            print(f"Loan already exists: {existing_loan.book.title} → {existing_loan.member.full_name}")
-    
-    print("\n" + "="*50)
-    print("SAMPLE DATA CREATION SUMMARY")
-    print("="*50)
-    print(f"Books created: {books_created} (Total: {Book.objects.count()})")
-    print(f"Members created: {members_created} (Total: {Member.objects.count()})")
-    print(f"Loans created: {loans_created} (Total: {Loan.objects.count()})")
-    print("\nAdmin credentials (if created):")
-    print("Username: admin")
-    print("Password: admin123")
-    print("="*50)
-    print("\nYou can now:")
-    print("1. Visit http://127.0.0.1:8000 to see the library dashboard")
-    print("2. Login to admin at http://127.0.0.1:8000/admin with above credentials")
-    print("3. Check the Books, Members, and Loans sections")
+    sys.stdout.write("\n".join(report) + "\n")
 
 if __name__ == '__main__':
-    create_sample_data()
\ No newline at end of file
+    # Setup Django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'library_management.settings')
+    try:
+        django.setup()
+    except Exception as e:
+        print(f"Error setting up Django: {e}")
+        sys.exit(1)
+    create_sample_data()